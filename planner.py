@@ -2,34 +2,51 @@
 """
 CLI tool to generate a structured 1-week learning plan using the Anthropic API.
 
-Two AI agents collaborate on every plan:
-  - Generator Agent  creates the initial plan
-  - Critic Agent     evaluates and produces a refined version
+Every plan is drafted, critiqued and refined:
+  - Planner Agent    does all three in a single call (the default)
+  - With --two-pass, a Generator Agent writes the draft and a separate
+    Critic Agent evaluates it and produces a refined version
 
 A memory layer (memory.json) persists prior topics and weak areas across sessions
-so both agents can build on what the user has already studied.
+so the agents can build on what the user has already studied.
 
 Usage:
     python planner.py "Python programming"
-    python planner.py "Docker" --verbose   # also shows original + critique
+    python planner.py "Docker" --verbose   # also shows draft + critique
     python planner.py --save "Kubernetes"  # saves refined plan to markdown
     python planner.py --history            # show all studied topics
     python planner.py                      # prompts interactively
 """
 
+from __future__ import annotations
+
+import io
 import sys
 import re
+import asyncio
 import json
+import hashlib
 import argparse
+import functools
+import sqlite3
+from dataclasses import dataclass
 from datetime import date
 from pathlib import Path
-import anthropic
-from dotenv import load_dotenv
+from typing import TYPE_CHECKING, Callable, Iterable, Optional, TypeVar
+
+# The Anthropic SDK (with httpx, pydantic and anyio) takes hundreds of
+# milliseconds to import, so it is loaded on first use via _import_sdk()
+# rather than here; --help and --history never touch it.
+if TYPE_CHECKING:
+    import anthropic
 
-load_dotenv()
+T = TypeVar("T")
 
 MEMORY_FILE = Path(__file__).parent / "memory.json"
 
+# Maximum number of in-flight API calls in --batch mode
+BATCH_CONCURRENCY = 8
+
 # ── Generator Agent prompt ────────────────────────────────────────────────────
 
 GENERATOR_SYSTEM_PROMPT = (
@@ -51,16 +68,17 @@ GENERATOR_SYSTEM_PROMPT = (
     "Never sacrifice coverage of a day for extra detail on an earlier one."
 )
 
-GENERATOR_PROMPT_TEMPLATE = """\
-Create a structured 1-week learning plan for the topic: "{topic}"
-
-Learner familiarity: {familiarity_label} — {familiarity_description}
-{familiarity_context}
+# The user prompt is split into a static prefix (cached server-side) and a
+# dynamic suffix holding every per-call substitution, so the cacheable prefix
+# is as long as possible.
+GENERATOR_STATIC_PREFIX = """\
+Create a structured 1-week learning plan for the topic given at the end of this message, \
+tailored to the learner familiarity described there.
 
 Cover Monday through Friday only. For each day provide exactly:
 
 **Day: <Day name>**
-- Focus: <one specific aspect of {topic} to concentrate on that day>
+- Focus: <one specific aspect of the topic to concentrate on that day>
 - Resources:
   1. <Resource name> — <one-sentence description and where to find it>
   2. <Resource name> — <one-sentence description and where to find it>
@@ -70,6 +88,13 @@ Build each day on the previous so the plan progresses logically and ends with th
 elevated in their understanding and ready to work confidently on real projects.
 """
 
+GENERATOR_DYNAMIC_SUFFIX = """\
+Topic: "{topic}"
+
+Learner familiarity: {familiarity_label} — {familiarity_description}
+{familiarity_context}
+"""
+
 # ── Critic Agent prompt ───────────────────────────────────────────────────────
 
 CRITIC_SYSTEM_PROMPT = (
@@ -87,9 +112,9 @@ CRITIC_SYSTEM_PROMPT = (
     "The refined plan must use the same day-by-day format as the original."
 )
 
-CRITIC_PROMPT_TEMPLATE = """\
-Below is a 1-week learning plan for the topic "{topic}" written for a learner \
-at the "{familiarity_label}" familiarity level.
+CRITIC_STATIC_PREFIX = """\
+This message ends with a 1-week learning plan, preceded by the topic and the learner \
+familiarity level it was written for.
 
 Evaluate it, then produce an improved version. Your response must use this exact structure \
 with no text outside it:
@@ -105,49 +130,115 @@ These will be saved to personalise future plans.>
 ## Refined Plan
 <The improved Monday–Friday plan using the same format as the original. \
 Fix every issue raised in your assessment.>
+"""
 
+CRITIC_DYNAMIC_SUFFIX = """\
+Topic: {topic}
+Familiarity: {familiarity_label}
 ---
 Original plan:
 {original_plan}
 """
 
+# Used instead of CRITIC_DYNAMIC_SUFFIX when the draft is a cached plan for a
+# related topic: the Critic must retarget it, not just polish it.
+CRITIC_ADAPT_SUFFIX = """Topic: {topic}
+Familiarity: {familiarity_label}
+---
+The plan below was written for a related topic, "{source_topic}", and is reused here as \
+a draft. It is not yet a plan for "{topic}". Before applying the four criteria, adapt it: \
+keep only the days, resources and exercises that genuinely serve "{topic}", replace \
+everything else, and make sure every day's focus, resources and exercise are about \
+"{topic}". Your assessment must say what was changed to fit the new topic, and the \
+refined plan must be a plan for "{topic}", not for "{source_topic}".
+---
+Original plan (written for "{source_topic}"):
+{original_plan}
+"""
+
+# ── Combined (single-pass) prompt ─────────────────────────────────────────────
+#
+# Default mode: one call drafts the plan, critiques it and writes the refined
+# version, halving round-trips versus the Generator → Critic pipeline.
+
+COMBINED_SYSTEM_PROMPT = (
+    GENERATOR_SYSTEM_PROMPT
+    + " Once your draft is written, switch roles. "
+    + CRITIC_SYSTEM_PROMPT
+)
+
+COMBINED_STATIC_PREFIX = GENERATOR_STATIC_PREFIX + """
+Write that plan as a draft, critique it, then produce an improved version. Your response \
+must use this exact structure with no text outside it:
+
+## Draft Plan
+<Your first Monday–Friday plan in the format above.>
+
+## Assessment
+<Your detailed critique of the draft covering difficulty progression, resource credibility, \
+exercise practicality, and confidence outcome. Be specific about what is weak and why.>
+
+## Key Weaknesses
+<A bullet list of 2–5 specific weaknesses, each in one concise sentence. \
+These will be saved to personalise future plans.>
+
+## Refined Plan
+<The improved Monday–Friday plan using the same format as the draft. \
+Fix every issue raised in your assessment.>
+"""
+
 # ── Familiarity levels ────────────────────────────────────────────────────────
 
-FAMILIARITY_LEVELS = [
-    {
-        "label": "Novice",
-        "description": "Never worked with it before",
-        "context": (
+@dataclass(frozen=True, slots=True)
+class Familiarity:
+    """A familiarity level the learner can pick, and the guidance it adds to prompts."""
+    label: str
+    description: str
+    context: str
+
+
+FAMILIARITY_LEVELS = (
+    Familiarity(
+        label="Novice",
+        description="Never worked with it before",
+        context=(
             "The learner has never worked with this topic before. "
             "Assume zero prior knowledge of the topic itself, though they are a competent developer. "
             "Day 1 must build confidence through pure concepts — no setup, no code. "
             "Every term introduced must be briefly defined. "
             "By the end of the week they should feel genuinely ready to contribute to a real codebase."
         ),
-    },
-    {
-        "label": "A little familiar",
-        "description": "Seen it or done a quick tutorial",
-        "context": (
+    ),
+    Familiarity(
+        label="A little familiar",
+        description="Seen it or done a quick tutorial",
+        context=(
             "The learner has a passing familiarity — perhaps followed a getting-started tutorial "
             "or read an overview — but has never built anything real with this topic. "
             "Day 1 should consolidate and sharpen existing mental models rather than re-explain basics. "
             "Pick up pace gradually from Day 2 onward, filling gaps and building toward production patterns. "
             "By the end of the week they should feel confident enough to own a feature in a professional project."
         ),
-    },
-    {
-        "label": "Quite familiar",
-        "description": "Used it in small projects or prototypes",
-        "context": (
+    ),
+    Familiarity(
+        label="Quite familiar",
+        description="Used it in small projects or prototypes",
+        context=(
             "The learner has used this topic in small projects and understands the core mechanics. "
             "Day 1 should challenge and deepen existing knowledge — focus on mental models, edge cases, "
             "or common misconceptions rather than re-covering ground they already know. "
             "Progress quickly toward advanced patterns, best practices, and production-readiness. "
             "By the end of the week they should feel ready to architect and lead work in this area."
         ),
-    },
-]
+    ),
+)
+
+# The familiarity menu never changes, so render it once at import time
+_MAX_LABEL = max(len(level.label) for level in FAMILIARITY_LEVELS)
+_MENU_STR = "\n".join(
+    f"  {i}. {level.label:<{_MAX_LABEL}}  —  {level.description}"
+    for i, level in enumerate(FAMILIARITY_LEVELS, 1)
+)
 
 # ── Memory ────────────────────────────────────────────────────────────────────
 
@@ -162,12 +253,12 @@ def load_memory() -> list[dict]:
         return []
 
 
-def save_to_memory(topic: str, familiarity: dict, date_str: str) -> None:
+def save_to_memory(topic: str, familiarity: Familiarity, date_str: str) -> None:
     """Append a completed session to memory.json."""
     sessions = load_memory()
     sessions.append({
         "topic": topic,
-        "familiarity_label": familiarity["label"],
+        "familiarity_label": familiarity.label,
         "date": date_str,
     })
     MEMORY_FILE.write_text(
@@ -178,7 +269,7 @@ def save_to_memory(topic: str, familiarity: dict, date_str: str) -> None:
 
 def build_memory_context(sessions: list[dict], current_topic: str) -> str:
     """
-    Build a memory context string to inject into agent system prompts.
+    Build a memory context string to inject into agent prompts.
     Returns an empty string if there are no prior sessions.
     """
     if not sessions:
@@ -213,15 +304,227 @@ def show_history(sessions: list[dict]) -> None:
     for i, s in enumerate(sessions, 1):
         print(f"  {i}. {s['topic']}  ({s['familiarity_label']} · {s['date']})")
 
+# ── Plan cache ────────────────────────────────────────────────────────────────
+#
+# Refined plans are memoised in SQLite under a hash of every input that shapes
+# them: the mode (single-pass or --two-pass) and the prompts it sends, the model,
+# the normalised topic and the familiarity level. An exact hit skips the API entirely; a closely related topic at the same
+# familiarity skips the Generator and hands the cached plan to the Critic to
+# adapt instead. Editing any prompt invalidates earlier entries automatically.
+
+CACHE_DIR = Path.home() / ".cache" / "learning-planner"
+PLAN_CACHE_DB = CACHE_DIR / "cache.db"
+# Bumped whenever the plans table changes; an older table is dropped and rebuilt
+PLAN_CACHE_SCHEMA = 2
+
+# A cached plan is reused as a draft only when its topic's words are a strict
+# subset (or superset) of the new topic's words, e.g. "Docker" and "Docker
+# Compose", and at least this fraction of all their words is shared. Character
+# similarity is not enough: "React" and "Preact" are unrelated topics.
+SIMILAR_TOPIC_MIN_OVERLAP = 0.5
+
+_TOPIC_WORD = re.compile(r"\w+")
+
+_cache_db: Optional[sqlite3.Connection] = None
+_cache_unavailable = False
+
+
+def _disable_cache(error: Exception) -> None:
+    """Warn once and stop using the plan cache for the rest of the process."""
+    global _cache_db, _cache_unavailable
+    if not _cache_unavailable:
+        print(f"Warning: plan cache unavailable ({error}); continuing without it.", file=sys.stderr)
+    _cache_unavailable = True
+    _cache_db = None
+
+
+def _get_cache_db() -> Optional[sqlite3.Connection]:
+    """
+    Return the plan cache connection, creating the database on first use.
+    Returns None if the cache directory or database cannot be used.
+    """
+    global _cache_db
+    if _cache_db is not None or _cache_unavailable:
+        return _cache_db
+
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(PLAN_CACHE_DB)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA journal_mode=WAL")
+        if db.execute("PRAGMA user_version").fetchone()[0] != PLAN_CACHE_SCHEMA:
+            db.execute("DROP TABLE IF EXISTS plans")
+            db.execute(f"PRAGMA user_version = {PLAN_CACHE_SCHEMA}")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS plans ("
+            " key TEXT PRIMARY KEY,"
+            " prompts TEXT NOT NULL,"
+            " topic TEXT NOT NULL,"
+            " slug TEXT NOT NULL,"
+            " familiarity_label TEXT NOT NULL,"
+            " mode TEXT NOT NULL,"
+            " refined_by TEXT NOT NULL,"
+            " assessment TEXT NOT NULL,"
+            " weaknesses TEXT NOT NULL,"
+            " refined_plan TEXT NOT NULL,"
+            " date TEXT NOT NULL)"
+        )
+    except (OSError, sqlite3.Error) as e:
+        _disable_cache(e)
+        return None
+
+    _cache_db = db
+    return _cache_db
+
+
+def plan_mode(two_pass: bool) -> str:
+    """Return the name of the mode a plan is generated in, as stored in the cache."""
+    return "two-pass" if two_pass else "single-pass"
+
+
+@functools.cache
+def _prompts_digest(two_pass: bool) -> str:
+    """
+    Hash of the mode, the model and every prompt that mode can send, so prompt
+    edits never serve stale plans and the two modes never serve each other's.
+    Either mode adapts a similar cached plan with the Critic.
+    """
+    if two_pass:
+        prompts = (
+            GENERATOR_SYSTEM_PROMPT,
+            GENERATOR_STATIC_PREFIX,
+            GENERATOR_DYNAMIC_SUFFIX,
+            CRITIC_SYSTEM_PROMPT,
+            CRITIC_STATIC_PREFIX,
+            CRITIC_DYNAMIC_SUFFIX,
+            CRITIC_ADAPT_SUFFIX,
+        )
+    else:
+        prompts = (
+            COMBINED_SYSTEM_PROMPT,
+            COMBINED_STATIC_PREFIX,
+            GENERATOR_DYNAMIC_SUFFIX,
+            CRITIC_SYSTEM_PROMPT,
+            CRITIC_STATIC_PREFIX,
+            CRITIC_ADAPT_SUFFIX,
+        )
+    parts = (plan_mode(two_pass), MODEL, *prompts)
+    return hashlib.blake2b(
+        b"||".join(part.encode("utf-8") for part in parts), digest_size=16
+    ).hexdigest()
+
+
+def plan_cache_key(topic: str, familiarity: Familiarity, two_pass: bool) -> str:
+    """Return the cache key for a (topic, familiarity) pair under the current mode and prompts."""
+    parts = (_prompts_digest(two_pass), normalise_topic(topic), familiarity.label)
+    return hashlib.blake2b(
+        b"||".join(part.encode("utf-8") for part in parts), digest_size=16
+    ).hexdigest()
+
+
+def store_cached_plan(
+    topic: str,
+    familiarity: Familiarity,
+    two_pass: bool,
+    refined_by: str,
+    assessment: str,
+    weaknesses: list[str],
+    refined_plan: str,
+    date_str: str,
+) -> None:
+    """
+    Add or replace the cached plan for (topic, familiarity) in the given mode.
+    refined_by names the agent that wrote it. Does nothing without a cache.
+    """
+    db = _get_cache_db()
+    if db is None:
+        return
+    try:
+        with db:
+            db.execute(
+                "INSERT OR REPLACE INTO plans VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    plan_cache_key(topic, familiarity, two_pass),
+                    _prompts_digest(two_pass),
+                    topic,
+                    slugify(topic),
+                    familiarity.label,
+                    plan_mode(two_pass),
+                    refined_by,
+                    assessment,
+                    json.dumps(weaknesses, ensure_ascii=False),
+                    refined_plan,
+                    date_str,
+                ),
+            )
+    except sqlite3.Error as e:
+        _disable_cache(e)
+
+
+def lookup_plan_cache(
+    topic: str, familiarity: Familiarity, two_pass: bool
+) -> tuple[Optional[dict], Optional[dict]]:
+    """
+    Return (cached, similar): the exact cached plan for (topic, familiarity) in the
+    given mode, or failing that the most similar cached plan to use as a draft.
+    Either may be None, and both are when the cache cannot be used.
+    """
+    db = _get_cache_db()
+    if db is None:
+        return None, None
+
+    try:
+        row = db.execute(
+            "SELECT topic, refined_by, assessment, weaknesses, refined_plan"
+            " FROM plans WHERE key = ?",
+            (plan_cache_key(topic, familiarity, two_pass),),
+        ).fetchone()
+        if row:
+            return {**row, "weaknesses": json.loads(row["weaknesses"])}, None
+
+        candidates = db.execute(
+            "SELECT topic, refined_plan FROM plans"
+            " WHERE familiarity_label = ? AND prompts = ?",
+            (familiarity.label, _prompts_digest(two_pass)),
+        ).fetchall()
+    except (sqlite3.Error, json.JSONDecodeError) as e:
+        _disable_cache(e)
+        return None, None
+
+    return None, find_similar_plan(candidates, topic)
+
+
+def normalise_topic(topic: str) -> str:
+    """Case-fold a topic and collapse its whitespace, keeping all other characters."""
+    return " ".join(topic.casefold().split())
+
+
+def find_similar_plan(candidates: Iterable[sqlite3.Row], topic: str) -> Optional[dict]:
+    """
+    Return the candidate whose topic is most closely related to topic (see
+    SIMILAR_TOPIC_MIN_OVERLAP), or None if no candidate qualifies.
+    """
+    words = frozenset(_TOPIC_WORD.findall(topic.casefold()))
+    best, best_overlap = None, SIMILAR_TOPIC_MIN_OVERLAP
+    for row in candidates:
+        other = frozenset(_TOPIC_WORD.findall(row["topic"].casefold()))
+        if not (words < other or other < words):
+            continue
+        overlap = len(words & other) / len(words | other)
+        if overlap >= best_overlap:
+            best, best_overlap = dict(row), overlap
+    return best
+
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
-def prompt_familiarity(topic: str) -> dict:
-    """Display the familiarity menu and return the chosen level."""
-    max_len = max(len(level["label"]) for level in FAMILIARITY_LEVELS)
+_SLUG_STRIP = re.compile(r"[^\w\s-]")
+_SLUG_DASH = re.compile(r"[\s_-]+")
+
 
+def prompt_familiarity(topic: str) -> Familiarity:
+    """Display the familiarity menu and return the chosen level."""
     print(f"\nHow familiar are you with {topic}?\n")
-    for i, level in enumerate(FAMILIARITY_LEVELS, 1):
-        print(f"  {i}. {level['label']:<{max_len}}  —  {level['description']}")
+    print(_MENU_STR)
     print()
 
     while True:
@@ -231,20 +534,61 @@ def prompt_familiarity(topic: str) -> dict:
             print()
             sys.exit(0)
 
-        if raw.isdigit() and 1 <= int(raw) <= len(FAMILIARITY_LEVELS):
-            chosen = FAMILIARITY_LEVELS[int(raw) - 1]
-            print(f"\nGot it — tailoring the plan for: {chosen['label']}")
-            return chosen
+        # isdecimal rather than isdigit: digits such as "²" pass isdigit but int() rejects them
+        if raw.isdecimal():
+            idx = int(raw)
+            if 1 <= idx <= len(FAMILIARITY_LEVELS):
+                chosen = FAMILIARITY_LEVELS[idx - 1]
+                print(f"\nGot it — tailoring the plan for: {chosen.label}")
+                return chosen
 
         print(f"Please enter a number between 1 and {len(FAMILIARITY_LEVELS)}.")
 
 
 def slugify(text: str) -> str:
     """Convert a topic string into a safe filename fragment."""
-    text = text.lower().strip()
-    text = re.sub(r"[^\w\s-]", "", text)
-    text = re.sub(r"[\s_-]+", "-", text)
-    return text[:50].strip("-")
+    text = _SLUG_STRIP.sub("", text.lower().strip())
+    return _SLUG_DASH.sub("-", text)[:50].strip("-")
+
+
+def unique_slugs(topics: list[str]) -> list[str]:
+    """
+    Slugify each topic, suffixing -2, -3, ... to any slug already taken, so topics
+    such as "C++" and "C#" never write to the same markdown file.
+    """
+    taken = set()
+    slugs = []
+    for topic in topics:
+        slug = base = slugify(topic)
+        n = 1
+        while slug in taken:
+            n += 1
+            slug = f"{base}-{n}"
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def load_batch_topics(path: str) -> list[str]:
+    """
+    Read one topic per line from path, skipping blank lines and duplicates. Topics
+    that differ only in case or whitespace count as duplicates, as in the plan cache.
+    """
+    try:
+        lines = Path(path).read_text(encoding="utf-8").splitlines()
+    except OSError as e:
+        print(f"Error: could not read batch file: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    unique = {}
+    for line in lines:
+        if line.strip():
+            unique.setdefault(normalise_topic(line), line.strip())
+    topics = list(unique.values())
+    if not topics:
+        print("Error: batch file contains no topics.", file=sys.stderr)
+        sys.exit(1)
+    return topics
 
 
 def section(title: str) -> None:
@@ -259,34 +603,317 @@ def parse_critic_response(text: str) -> tuple[str, list[str], str]:
     Split the critic's response into (assessment, weaknesses, refined_plan).
     Handles missing sections gracefully.
     """
-    assessment, weaknesses, refined = "", [], text.strip()
+    # partition scans once per marker; an empty separator means "not found"
+    before, sep, r_part = text.partition("## Refined Plan")
+    if not sep:
+        return "", [], text.strip()
+
+    # The weaknesses section is optional; without it w_part is simply empty
+    a_part, _, w_part = before.partition("## Key Weaknesses")
+    assessment = a_part.replace("## Assessment", "").strip()
+    weaknesses = [
+        line.lstrip("-•* ").strip()
+        for line in w_part.splitlines()
+        # Skip horizontal rules such as "---", which would parse as empty bullets
+        if line.strip() and line.strip()[0] in "-•*" and line.strip(" -•*")
+    ]
+
+    return assessment, weaknesses, r_part.strip()
+
+
+def parse_combined_response(text: str) -> tuple[str, str, list[str], str]:
+    """
+    Split a single-pass response into (draft, assessment, weaknesses, refined_plan).
+    Falls back to treating the whole text as the critic-style response.
+    """
+    d_part, sep, rest = text.partition("## Assessment")
+    if not sep:
+        d_part, rest = "", text
 
-    if "## Key Weaknesses" in text and "## Refined Plan" in text:
-        a_part, rest = text.split("## Key Weaknesses", 1)
-        assessment = a_part.replace("## Assessment", "").strip()
+    return (d_part.replace("## Draft Plan", "").strip(), *parse_critic_response(rest))
 
-        w_part, r_part = rest.split("## Refined Plan", 1)
-        weaknesses = [
-            line.lstrip("-•* ").strip()
-            for line in w_part.splitlines()
-            if line.strip() and line.strip()[0] in "-•*"
-        ]
-        refined = r_part.strip()
 
-    elif "## Refined Plan" in text:
-        # Critic produced assessment + refined plan but skipped the weaknesses section
-        a_part, r_part = text.split("## Refined Plan", 1)
-        assessment = a_part.replace("## Assessment", "").strip()
-        refined = r_part.strip()
+def _echo(text: str) -> None:
+    """Write streamed text to stdout, flushing only at line boundaries."""
+    sys.stdout.write(text)
+    if "\n" in text:
+        sys.stdout.flush()
 
-    return assessment, weaknesses, refined
+
+def stream_text(text_stream, verbose: bool, stop_markers: tuple[str, ...] = ()) -> str:
+    """
+    Collect a text stream into one string. When verbose, echo it to stdout as it
+    arrives, stopping just before whichever of stop_markers appears first.
+    """
+    # Longest tail that could be the start of a marker split across chunks
+    hold = max((len(marker) for marker in stop_markers), default=1) - 1
+    buf = io.StringIO()
+    pending = ""
+    echoing = verbose
+    for text in text_stream:
+        buf.write(text)
+        if not echoing:
+            continue
+
+        pending += text
+        if not stop_markers:
+            _echo(pending)
+            pending = ""
+            continue
+
+        found = [i for i in (pending.find(marker) for marker in stop_markers) if i != -1]
+        if found:
+            idx = min(found)
+            _echo(pending[:idx])
+            echoing = False
+            continue
+
+        safe = len(pending) - hold
+        if safe > 0:
+            _echo(pending[:safe])
+            pending = pending[safe:]
+
+    if echoing and pending:
+        _echo(pending)
+    if verbose:
+        sys.stdout.flush()
+
+    return buf.getvalue()
+
+
+def with_api_errors(run: Callable[[], T]) -> T:
+    """
+    Call run() and return its result, turning Anthropic API errors into a message
+    and a non-zero exit.
+    """
+    try:
+        return run()
+    except Exception as e:
+        # Only a run that made a request has imported the SDK, and only then can
+        # this be one of its errors; a cached plan never pays for the import.
+        anthropic = sys.modules.get("anthropic")
+        if anthropic is None:
+            raise
+        if isinstance(e, anthropic.AuthenticationError):
+            print(
+                "Error: invalid or missing API key.\n"
+                "Add it to your .env file: ANTHROPIC_API_KEY=your-key-here",
+                file=sys.stderr,
+            )
+        elif isinstance(e, anthropic.APIConnectionError):
+            print("Error: could not connect to the Anthropic API. Check your internet connection.", file=sys.stderr)
+        elif isinstance(e, anthropic.RateLimitError):
+            print("Error: rate limit reached. Wait a moment and try again.", file=sys.stderr)
+        elif isinstance(e, anthropic.APIStatusError):
+            print(f"API error {e.status_code}: {e.message}", file=sys.stderr)
+        else:
+            raise
+        sys.exit(1)
+
+# ── Prompt caching ────────────────────────────────────────────────────────────
+
+# A one-hour TTL (instead of the default five minutes) keeps the cached prompt
+# prefixes warm across separate CLI runs within an interactive session
+CACHE_CONTROL = {"type": "ephemeral", "ttl": "1h"}
+EXTENDED_CACHE_TTL_BETA = {"anthropic-beta": "extended-cache-ttl-2025-04-11"}
+
+
+def build_system(system_prompt: str) -> list[dict]:
+    """Build the system blocks for an agent call, with the static prompt marked for caching."""
+    return [{"type": "text", "text": system_prompt, "cache_control": CACHE_CONTROL}]
+
+
+def build_user_content(
+    static_prefix: str, dynamic_suffix: str, memory_context: str = ""
+) -> list[dict]:
+    """
+    Build user content with the cached static prefix first and all per-call text
+    after it. The memory context names the current topic and grows every session,
+    so it must follow every cache breakpoint rather than sit in the system blocks.
+    """
+    blocks = [{"type": "text", "text": static_prefix, "cache_control": CACHE_CONTROL}]
+    if memory_context:
+        blocks.append({"type": "text", "text": memory_context})
+    blocks.append({"type": "text", "text": dynamic_suffix})
+    return blocks
+
+# ── API client ────────────────────────────────────────────────────────────────
+
+# HTTP/2 multiplexes concurrent requests over one connection, so only a few
+# keep-alive connections are ever needed
+HTTP_KEEPALIVE_CONNECTIONS = 4
+
+_client: Optional[anthropic.Anthropic] = None
+
+
+@functools.cache
+def _import_sdk():
+    """Load .env and import the Anthropic SDK, once, on first use."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    import anthropic
+
+    return anthropic
+
+
+def _get_client() -> anthropic.Anthropic:
+    """Return the shared client, creating it on first use so its connection pool is reused."""
+    global _client
+    if _client is None:
+        anthropic = _import_sdk()
+        import httpx
+
+        limits = httpx.Limits(max_keepalive_connections=HTTP_KEEPALIVE_CONNECTIONS)
+        _client = anthropic.Anthropic(
+            http_client=anthropic.DefaultHttpxClient(http2=True, limits=limits),
+            default_headers=EXTENDED_CACHE_TTL_BETA,
+        )
+    return _client
+
+
+def _new_async_client() -> anthropic.AsyncAnthropic:
+    """Create an HTTP/2 async client for --batch mode."""
+    anthropic = _import_sdk()
+    import httpx
+
+    limits = httpx.Limits(max_keepalive_connections=HTTP_KEEPALIVE_CONNECTIONS)
+    return anthropic.AsyncAnthropic(
+        http_client=anthropic.DefaultAsyncHttpxClient(http2=True, limits=limits),
+        default_headers=EXTENDED_CACHE_TTL_BETA,
+    )
 
 # ── Agents ────────────────────────────────────────────────────────────────────
 
+MODEL = "claude-haiku-4-5-20251001"
+
+# Output caps sized with headroom over typical responses (roughly 3.5k tokens for
+# a draft, 6.5k for a critique plus refined plan, 2.5k for a single-pass reply).
+# A response cut off at its cap is retried once with RETRY_MAX_TOKENS so a plan
+# is never returned missing its final days.
+GENERATOR_MAX_TOKENS = 4096
+CRITIC_MAX_TOKENS = 8192
+COMBINED_MAX_TOKENS = 8192
+RETRY_MAX_TOKENS = 16384
+
+
+def stream_message(
+    client: anthropic.Anthropic,
+    request: dict,
+    verbose: bool,
+    stop_markers: tuple[str, ...] = (),
+) -> str:
+    """
+    Stream a Messages API call and return its text, echoing it when verbose
+    (see stream_text). Retries once with RETRY_MAX_TOKENS if the response was
+    cut off at max_tokens.
+    """
+    with client.messages.stream(**request) as stream:
+        text = stream_text(stream.text_stream, verbose, stop_markers)
+        stop_reason = stream.get_final_message().stop_reason
+
+    if stop_reason == "max_tokens" and request["max_tokens"] < RETRY_MAX_TOKENS:
+        if verbose:
+            print("\n\n[Response hit the token limit — retrying with a larger limit]\n")
+        return stream_message(
+            client, {**request, "max_tokens": RETRY_MAX_TOKENS}, verbose, stop_markers
+        )
+    return text
+
+
+async def stream_message_async(client: anthropic.AsyncAnthropic, request: dict) -> str:
+    """Async stream_message for batch mode. Never echoes to stdout."""
+    async with client.messages.stream(**request) as stream:
+        message = await stream.get_final_message()
+        text = await stream.get_final_text()
+
+    if message.stop_reason == "max_tokens" and request["max_tokens"] < RETRY_MAX_TOKENS:
+        return await stream_message_async(
+            client, {**request, "max_tokens": RETRY_MAX_TOKENS}
+        )
+    return text
+
+
+def _plan_prompt(topic: str, familiarity: Familiarity) -> str:
+    """Fill in the topic and familiarity fields shared by the Generator and Planner prompts."""
+    return GENERATOR_DYNAMIC_SUFFIX.format(
+        topic=topic,
+        familiarity_label=familiarity.label,
+        familiarity_description=familiarity.description,
+        familiarity_context=familiarity.context,
+    )
+
+
+def _agent_request(
+    system_prompt: str,
+    static_prefix: str,
+    prompt: str,
+    max_tokens: int,
+    memory_context: str,
+) -> dict:
+    """Build the Messages API arguments shared by every agent call."""
+    return {
+        "model": MODEL,
+        "max_tokens": max_tokens,
+        "system": build_system(system_prompt),
+        "messages": [
+            {
+                "role": "user",
+                "content": build_user_content(static_prefix, prompt, memory_context),
+            }
+        ],
+    }
+
+
+def generator_request(topic: str, familiarity: Familiarity, memory_context: str) -> dict:
+    """Build the Messages API arguments for a Generator Agent call."""
+    return _agent_request(
+        GENERATOR_SYSTEM_PROMPT,
+        GENERATOR_STATIC_PREFIX,
+        _plan_prompt(topic, familiarity),
+        GENERATOR_MAX_TOKENS,
+        memory_context,
+    )
+
+
+def critic_request(
+    topic: str,
+    familiarity: Familiarity,
+    original_plan: str,
+    memory_context: str,
+    source_topic: str = "",
+) -> dict:
+    """
+    Build the Messages API arguments for a Critic Agent call. source_topic names
+    the related topic a cached draft was written for, and asks the Critic to adapt it.
+    """
+    suffix = CRITIC_ADAPT_SUFFIX if source_topic else CRITIC_DYNAMIC_SUFFIX
+    prompt = suffix.format(
+        topic=topic,
+        familiarity_label=familiarity.label,
+        original_plan=original_plan,
+        source_topic=source_topic,
+    )
+    return _agent_request(
+        CRITIC_SYSTEM_PROMPT, CRITIC_STATIC_PREFIX, prompt, CRITIC_MAX_TOKENS, memory_context
+    )
+
+
+def combined_request(topic: str, familiarity: Familiarity, memory_context: str) -> dict:
+    """Build the Messages API arguments for a single-pass draft + critique call."""
+    return _agent_request(
+        COMBINED_SYSTEM_PROMPT,
+        COMBINED_STATIC_PREFIX,
+        _plan_prompt(topic, familiarity),
+        COMBINED_MAX_TOKENS,
+        memory_context,
+    )
+
+
 def run_generator(
     client: anthropic.Anthropic,
     topic: str,
-    familiarity: dict,
+    familiarity: Familiarity,
     memory_context: str,
     verbose: bool,
 ) -> str:
@@ -294,134 +921,375 @@ def run_generator(
     Generator Agent — drafts the initial learning plan.
     Streams to stdout when verbose; always returns the full plan text.
     """
-    prompt = GENERATOR_PROMPT_TEMPLATE.format(
-        topic=topic,
-        familiarity_label=familiarity["label"],
-        familiarity_description=familiarity["description"],
-        familiarity_context=familiarity["context"],
+    return stream_message(
+        client, generator_request(topic, familiarity, memory_context), verbose
     )
 
-    system = GENERATOR_SYSTEM_PROMPT
-    if memory_context:
-        system += "\n\n" + memory_context
-
-    chunks: list[str] = []
-    with client.messages.stream(
-        model="claude-haiku-4-5-20251001",
-        max_tokens=4096,
-        system=system,
-        messages=[{"role": "user", "content": prompt}],
-    ) as stream:
-        for text in stream.text_stream:
-            if verbose:
-                print(text, end="", flush=True)
-            chunks.append(text)
-
-    return "".join(chunks)
-
 
 def run_critic(
     client: anthropic.Anthropic,
     topic: str,
-    familiarity: dict,
+    familiarity: Familiarity,
     original_plan: str,
     memory_context: str,
+    verbose: bool,
+    source_topic: str = "",
 ) -> tuple[str, list[str], str]:
     """
-    Critic Agent — evaluates the draft plan and returns an improved version.
+    Critic Agent — evaluates the draft plan and returns an improved version,
+    adapting it first when it was written for source_topic.
+    Streams the assessment to stdout when verbose.
     Returns (assessment, weaknesses, refined_plan).
     """
-    prompt = CRITIC_PROMPT_TEMPLATE.format(
-        topic=topic,
-        familiarity_label=familiarity["label"],
-        original_plan=original_plan,
+    text = stream_message(
+        client,
+        critic_request(topic, familiarity, original_plan, memory_context, source_topic),
+        verbose,
+        # Key Weaknesses is optional, so stop at Refined Plan if it comes first
+        stop_markers=("## Key Weaknesses", "## Refined Plan"),
+    )
+
+    return parse_critic_response(text)
+
+
+def run_combined(
+    client: anthropic.Anthropic,
+    topic: str,
+    familiarity: Familiarity,
+    memory_context: str,
+    verbose: bool,
+) -> tuple[str, str, list[str], str]:
+    """
+    Single-pass agent — drafts, critiques and refines the plan in one call.
+    Streams the draft to stdout when verbose.
+    Returns (draft, assessment, weaknesses, refined_plan).
+    """
+    text = stream_message(
+        client,
+        combined_request(topic, familiarity, memory_context),
+        verbose,
+        stop_markers=("## Assessment", "## Key Weaknesses", "## Refined Plan"),
+    )
+
+    return parse_combined_response(text)
+
+
+async def run_generator_async(
+    client: anthropic.AsyncAnthropic,
+    topic: str,
+    familiarity: Familiarity,
+    memory_context: str,
+) -> str:
+    """Async Generator Agent for batch mode. Never streams to stdout."""
+    return await stream_message_async(
+        client, generator_request(topic, familiarity, memory_context)
     )
 
-    system = CRITIC_SYSTEM_PROMPT
-    if memory_context:
-        system += "\n\n" + memory_context
 
-    response = client.messages.create(
-        model="claude-haiku-4-5-20251001",
-        max_tokens=8192,
-        system=system,
-        messages=[{"role": "user", "content": prompt}],
+async def run_critic_async(
+    client: anthropic.AsyncAnthropic,
+    topic: str,
+    familiarity: Familiarity,
+    original_plan: str,
+    memory_context: str,
+    source_topic: str = "",
+) -> tuple[str, list[str], str]:
+    """Async Critic Agent for batch mode. Returns (assessment, weaknesses, refined_plan)."""
+    text = await stream_message_async(
+        client,
+        critic_request(topic, familiarity, original_plan, memory_context, source_topic),
+    )
+    return parse_critic_response(text)
+
+
+async def run_combined_async(
+    client: anthropic.AsyncAnthropic,
+    topic: str,
+    familiarity: Familiarity,
+    memory_context: str,
+) -> tuple[str, str, list[str], str]:
+    """Async single-pass agent for batch mode. Returns (draft, assessment, weaknesses, refined_plan)."""
+    text = await stream_message_async(
+        client, combined_request(topic, familiarity, memory_context)
     )
+    return parse_combined_response(text)
+
+# ── Output ────────────────────────────────────────────────────────────────────
+
+def print_plan(topic: str, refined_plan: str) -> None:
+    """Print the final refined plan between dividers."""
+    print(f"1-Week Learning Plan: {topic}")
+    print("=" * 60)
+    print(refined_plan)
+    print("\n" + "=" * 60)
+
+
+def save_markdown(
+    topic: str, familiarity: Familiarity, refined_plan: str, today: str, slug: str = ""
+) -> Path:
+    """
+    Write the refined plan to learning-plan-<slug>-<date>.md and return its path.
+    slug defaults to slugify(topic).
+    """
+    slug = slug or slugify(topic)
+    filename = f"learning-plan-{slug}-{today}.md"
+    output_path = Path(filename)
+
+    # Write the header and plan straight to the file rather than concatenating
+    # them into one more full-size copy of the plan first.
+    with output_path.open("w", encoding="utf-8") as fh:
+        fh.write(f"# 1-Week Learning Plan: {topic}\n\n")
+        fh.write(f"*Generated on {today} · Familiarity: {familiarity.label}*\n\n")
+        fh.write(refined_plan)
+    return output_path
+
 
-    return parse_critic_response(response.content[0].text)
+def record_session(
+    topic: str,
+    familiarity: Familiarity,
+    refined_plan: str,
+    today: str,
+    save: bool,
+    slug: str = "",
+) -> Optional[Path]:
+    """
+    Save the session to memory and, when save is set, the plan to markdown
+    (see save_markdown). Returns the markdown path, or None if nothing was written.
+    """
+    save_to_memory(topic, familiarity, today)
+    if save:
+        return save_markdown(topic, familiarity, refined_plan, today, slug)
+    return None
 
 # ── Orchestrator ──────────────────────────────────────────────────────────────
 
 def generate_learning_plan(
-    topic: str, familiarity: dict, save: bool = False, verbose: bool = False
+    topic: str,
+    familiarity: Familiarity,
+    save: bool = False,
+    verbose: bool = False,
+    use_cache: bool = True,
+    two_pass: bool = False,
 ) -> None:
-    client = anthropic.Anthropic()
-
-    # ── Step 1: Load memory and build context ─────────────────
+    # ── Step 1: Load memory, context and any cached plan ──────
     sessions = load_memory()
     if sessions:
         count = len(sessions)
         print(f"\nLoaded {count} prior session{'s' if count != 1 else ''} from memory.")
     memory_context = build_memory_context(sessions, topic)
 
-    # ── Step 2: Generator Agent ───────────────────────────────
-    if verbose:
-        section("Generator Agent")
-    else:
-        print("\nGenerating plan...", end="", flush=True)
-
-    original_plan = run_generator(client, topic, familiarity, memory_context, verbose)
+    cached, similar = (
+        lookup_plan_cache(topic, familiarity, two_pass) if use_cache else (None, None)
+    )
+    refined_by = "Critic Agent"
+    assessment_shown = False
+
+    if cached:
+        print("\nFound a cached plan for this topic and familiarity — skipping the agents.\n")
+        refined_by = cached["refined_by"]
+        assessment = cached["assessment"]
+        weaknesses = cached["weaknesses"]
+        refined_plan = cached["refined_plan"]
+
+    elif similar or two_pass:
+        # ── Step 2: Generator Agent (or a similar cached plan) ─
+        source_topic = similar["topic"] if similar else ""
+        if similar:
+            print(f"\nReusing your cached plan for {source_topic} as the draft.")
+            original_plan = similar["refined_plan"]
+        else:
+            if verbose:
+                section("Generator Agent")
+            else:
+                print("\nGenerating plan...", end="", flush=True)
+
+            original_plan = run_generator(_get_client(), topic, familiarity, memory_context, verbose)
+
+            if not verbose:
+                print(" done.")
+
+        # ── Step 3: Critic Agent ──────────────────────────────
+        if verbose:
+            section("Critic Agent — evaluating...")
+        elif similar:
+            print(f"Adapting it to {topic} with Critic Agent...", end="", flush=True)
+        else:
+            print("Refining with Critic Agent...", end="", flush=True)
+
+        assessment, weaknesses, refined_plan = run_critic(
+            _get_client(),
+            topic,
+            familiarity,
+            original_plan,
+            memory_context,
+            verbose,
+            source_topic=source_topic,
+        )
+        assessment_shown = verbose
 
-    if not verbose:
-        print(" done.")
+        if not verbose:
+            print(" done.\n")
 
-    # ── Step 3: Critic Agent ──────────────────────────────────
-    if verbose:
-        section("Critic Agent — evaluating...")
     else:
-        print("Refining with Critic Agent...", end="", flush=True)
-
-    assessment, weaknesses, refined_plan = run_critic(
-        client, topic, familiarity, original_plan, memory_context
-    )
+        # ── Steps 2–3: Draft, critique and refine in one call ─
+        if verbose:
+            section("Planner Agent — draft")
+        else:
+            print("\nGenerating and refining plan...", end="", flush=True)
+
+        _, assessment, weaknesses, refined_plan = run_combined(
+            _get_client(), topic, familiarity, memory_context, verbose
+        )
+        refined_by = "Planner Agent"
 
-    if not verbose:
-        print(" done.\n")
+        if verbose:
+            section("Planner Agent — self-critique")
+        else:
+            print(" done.\n")
 
     # ── Step 4: Display results ───────────────────────────────
     if verbose and assessment:
-        print(assessment)
+        if not assessment_shown:
+            print(assessment)
         if weaknesses:
             print("\nKey weaknesses identified:")
             for w in weaknesses:
                 print(f"  • {w}")
-        section("Critic Agent — refined plan")
+        section(f"{refined_by} — refined plan")
 
-    print(f"1-Week Learning Plan: {topic}")
-    print("=" * 60)
-    print(refined_plan)
-    print("\n" + "=" * 60)
+    print_plan(topic, refined_plan)
     print("Plan complete. Good luck with your studies!")
 
-    # ── Step 5: Save to memory ────────────────────────────────
+    # ── Step 5: Save to the plan cache, memory and markdown ───
     today = date.today().strftime("%Y-%m-%d")
-    save_to_memory(topic, familiarity, today)
+    if not cached:
+        store_cached_plan(
+            topic, familiarity, two_pass, refined_by, assessment, weaknesses, refined_plan, today
+        )
+
+    output_path = record_session(topic, familiarity, refined_plan, today, save)
     print("Session saved to memory.")
+    if output_path:
+        print(f"Saved to: {output_path.resolve()}")
 
-    # ── Step 6: Save to markdown ──────────────────────────────
-    if save:
-        slug = slugify(topic)
-        filename = f"learning-plan-{slug}-{today}.md"
-        output_path = Path(filename)
-
-        md_content = (
-            f"# 1-Week Learning Plan: {topic}\n\n"
-            f"*Generated on {today} · Familiarity: {familiarity['label']}*\n\n"
-            + refined_plan
+
+async def generate_learning_plan_async(
+    client: anthropic.AsyncAnthropic,
+    semaphore: asyncio.Semaphore,
+    topic: str,
+    slug: str,
+    familiarity: Familiarity,
+    sessions: list[dict],
+    save: bool,
+    use_cache: bool,
+    two_pass: bool,
+) -> None:
+    """
+    Generate the plan for one topic of a batch, in one call or via Generator → Critic,
+    saving it as markdown under slug when save is set.
+    Each API call holds the shared semaphore so concurrent requests stay bounded.
+    """
+    memory_context = build_memory_context(sessions, topic)
+    today = date.today().strftime("%Y-%m-%d")
+
+    cached, similar = (
+        lookup_plan_cache(topic, familiarity, two_pass) if use_cache else (None, None)
+    )
+
+    if cached:
+        refined_plan = cached["refined_plan"]
+    else:
+        if similar or two_pass:
+            if similar:
+                original_plan = similar["refined_plan"]
+            else:
+                async with semaphore:
+                    original_plan = await run_generator_async(
+                        client, topic, familiarity, memory_context
+                    )
+            async with semaphore:
+                assessment, weaknesses, refined_plan = await run_critic_async(
+                    client,
+                    topic,
+                    familiarity,
+                    original_plan,
+                    memory_context,
+                    source_topic=similar["topic"] if similar else "",
+                )
+            refined_by = "Critic Agent"
+        else:
+            async with semaphore:
+                _, assessment, weaknesses, refined_plan = await run_combined_async(
+                    client, topic, familiarity, memory_context
+                )
+            refined_by = "Planner Agent"
+        store_cached_plan(
+            topic, familiarity, two_pass, refined_by, assessment, weaknesses, refined_plan, today
         )
-        output_path.write_text(md_content, encoding="utf-8")
+
+    print()
+    print_plan(topic, refined_plan)
+
+    output_path = record_session(topic, familiarity, refined_plan, today, save, slug)
+    if output_path:
         print(f"Saved to: {output_path.resolve()}")
 
+
+async def generate_batch(
+    topics: list[str],
+    familiarity: Familiarity,
+    save: bool = False,
+    use_cache: bool = True,
+    two_pass: bool = False,
+) -> list[str]:
+    """
+    Generate plans for several topics concurrently. With two_pass, each topic's
+    Critic call starts as soon as its own Generator call finishes; plans print
+    as they complete. A topic whose API calls fail is reported without stopping
+    the others, except for authentication and connection errors, which are
+    raised. Returns the topics that failed.
+    """
+    anthropic = _import_sdk()
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    sessions = load_memory()
+    count = len(topics)
+    print(f"\nGenerating plans for {count} topic{'s' if count != 1 else ''}...")
+
+    async with _new_async_client() as client:
+        results = await asyncio.gather(
+            *(
+                generate_learning_plan_async(
+                    client,
+                    semaphore,
+                    topic,
+                    slug,
+                    familiarity,
+                    sessions,
+                    save,
+                    use_cache,
+                    two_pass,
+                )
+                for topic, slug in zip(topics, unique_slugs(topics))
+            ),
+            return_exceptions=True,
+        )
+
+    failed = []
+    for topic, result in zip(topics, results):
+        # A bad key or no connection fails every topic alike; report it once
+        if isinstance(result, (anthropic.AuthenticationError, anthropic.APIConnectionError)):
+            raise result
+        if isinstance(result, anthropic.APIError):
+            print(f"Error: could not generate a plan for {topic}: {result}", file=sys.stderr)
+            failed.append(topic)
+        elif isinstance(result, BaseException):
+            raise result
+
+    done = count - len(failed)
+    print(f"\n{done} of {count} plan{'s' if count != 1 else ''} complete. Sessions saved to memory.")
+    return failed
+
 # ── Entry point ───────────────────────────────────────────────────────────────
 
 def main() -> None:
@@ -432,7 +1300,9 @@ def main() -> None:
             "Examples:\n"
             '  python planner.py "Python programming"\n'
             '  python planner.py "Docker" --verbose\n'
+            '  python planner.py "Docker" --two-pass\n'
             '  python planner.py "Redis" --save\n'
+            "  python planner.py --batch topics.txt --save\n"
             "  python planner.py --history\n"
             "  python planner.py          # interactive prompt"
         ),
@@ -451,10 +1321,31 @@ def main() -> None:
         "-v", "--verbose",
         action="store_true",
         help=(
-            "Show the Generator Agent's original plan and the Critic Agent's feedback "
-            "before the final refined plan."
+            "Show the draft plan and its critique before the final refined plan "
+            "(from the Planner Agent, or the Generator and Critic with --two-pass)."
+        ),
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help=(
+            "Generate plans for every topic in FILE (one per line) concurrently. "
+            "All topics share one familiarity level; --verbose is ignored."
+        ),
+    )
+    parser.add_argument(
+        "--two-pass",
+        action="store_true",
+        help=(
+            "Use separate Generator and Critic Agent calls instead of a single call "
+            "that drafts, critiques and refines the plan."
         ),
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore cached plans and always generate a fresh one (the new plan is still cached).",
+    )
     parser.add_argument(
         "--history",
         action="store_true",
@@ -463,10 +1354,33 @@ def main() -> None:
 
     args = parser.parse_args()
 
+    # Streamed output is flushed per line rather than per token, which keeps
+    # redirected and piped output from issuing a write() for every chunk
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(line_buffering=True)
+
     if args.history:
         show_history(load_memory())
         return
 
+    if args.batch:
+        if args.topic:
+            parser.error("a topic cannot be combined with --batch")
+        topics = load_batch_topics(args.batch)
+        familiarity = prompt_familiarity("these topics")
+        failed = with_api_errors(lambda: asyncio.run(
+            generate_batch(
+                topics,
+                familiarity,
+                save=args.save,
+                use_cache=not args.no_cache,
+                two_pass=args.two_pass,
+            )
+        ))
+        if failed:
+            sys.exit(1)
+        return
+
     topic = args.topic
     if not topic:
         try:
@@ -480,25 +1394,14 @@ def main() -> None:
         sys.exit(1)
 
     familiarity = prompt_familiarity(topic)
-
-    try:
-        generate_learning_plan(topic, familiarity, save=args.save, verbose=args.verbose)
-    except anthropic.AuthenticationError:
-        print(
-            "Error: invalid or missing API key.\n"
-            "Add it to your .env file: ANTHROPIC_API_KEY=your-key-here",
-            file=sys.stderr,
-        )
-        sys.exit(1)
-    except anthropic.APIConnectionError:
-        print("Error: could not connect to the Anthropic API. Check your internet connection.", file=sys.stderr)
-        sys.exit(1)
-    except anthropic.RateLimitError:
-        print("Error: rate limit reached. Wait a moment and try again.", file=sys.stderr)
-        sys.exit(1)
-    except anthropic.APIStatusError as e:
-        print(f"API error {e.status_code}: {e.message}", file=sys.stderr)
-        sys.exit(1)
+    with_api_errors(lambda: generate_learning_plan(
+        topic,
+        familiarity,
+        save=args.save,
+        verbose=args.verbose,
+        use_cache=not args.no_cache,
+        two_pass=args.two_pass,
+    ))
 
 
 if __name__ == "__main__":